@@ -0,0 +1,198 @@
+"""Address encoding for output scripts.
+
+Reference:
+https://en.bitcoin.it/wiki/Technical_background_of_version_1_Bitcoin_addresses
+https://github.com/bitcoin/bips/blob/master/bip-0173.mediawiki
+https://github.com/bitcoin/bips/blob/master/bip-0350.mediawiki
+
+"""
+import hashlib
+from typing import Optional, Sequence
+
+import base58
+
+from .constants import Network
+from .script import Script, ScriptType
+
+
+BECH32_CHARSET = 'qpzry9x8gf2tvdw0s3jn54khce6mua7l'
+BECH32_CONST = 1
+BECH32M_CONST = 0x2bc830a3
+
+
+class AddressError(ValueError):
+    """Raised for addresses which are malformed or belong to another
+    network."""
+
+
+def hash160(data: bytes) -> bytes:
+    return hashlib.new('ripemd160', hashlib.sha256(data).digest()).digest()
+
+
+def _bech32_polymod(values: Sequence[int]) -> int:
+    generator = [0x3b6a57b2, 0x26508e6d, 0x1ea119fa, 0x3d4233dd, 0x2a1462b3]
+    checksum = 1
+    for value in values:
+        top = checksum >> 25
+        checksum = (checksum & 0x1ffffff) << 5 ^ value
+        for i in range(5):
+            if (top >> i) & 1:
+                checksum ^= generator[i]
+    return checksum
+
+
+def _bech32_hrp_expand(hrp: str) -> list:
+    return [ord(x) >> 5 for x in hrp] + [0] + [ord(x) & 31 for x in hrp]
+
+
+def _convert_bits(
+        data: Sequence[int],
+        from_bits: int,
+        to_bits: int,
+        pad: bool,
+) -> Optional[list]:
+    acc = 0
+    bits = 0
+    result = []
+    max_value = (1 << to_bits) - 1
+    for value in data:
+        acc = (acc << from_bits) | value
+        bits += from_bits
+        while bits >= to_bits:
+            bits -= to_bits
+            result.append((acc >> bits) & max_value)
+    if pad:
+        if bits:
+            result.append((acc << (to_bits - bits)) & max_value)
+    elif bits >= from_bits or ((acc << (to_bits - bits)) & max_value):
+        return None
+    return result
+
+
+def encode_segwit_address(
+        hrp: str,
+        witness_version: int,
+        witness_program: bytes,
+) -> str:
+    """Bech32 for version 0 witness programs, bech32m for later versions."""
+    const = BECH32_CONST if witness_version == 0 else BECH32M_CONST
+    data = [witness_version] + _convert_bits(witness_program, 8, 5, True)
+    polymod = _bech32_polymod(
+        _bech32_hrp_expand(hrp) + data + [0] * 6
+    ) ^ const
+    checksum = [(polymod >> 5 * (5 - i)) & 31 for i in range(6)]
+    return hrp + '1' + ''.join(BECH32_CHARSET[d] for d in data + checksum)
+
+
+def decode_segwit_address(hrp: str, address: str) -> (int, bytes):
+    """Inverse of `encode_segwit_address`.
+
+    :raises AddressError: if the address is malformed or its human-readable
+        part is not `hrp`.
+
+    """
+    if address.lower() != address and address.upper() != address:
+        raise AddressError('Mixed case address: {}'.format(address))
+    address = address.lower()
+    separator = address.rfind('1')
+    if separator < 1 or separator + 7 > len(address) or len(address) > 90:
+        raise AddressError('Malformed bech32 address: {}'.format(address))
+    if address[:separator] != hrp:
+        raise AddressError(
+            'Address {} does not belong to a network with prefix {}'
+            .format(address, hrp))
+    try:
+        data = [BECH32_CHARSET.index(x) for x in address[separator + 1:]]
+    except ValueError:
+        raise AddressError('Malformed bech32 address: {}'.format(address))
+
+    const = _bech32_polymod(_bech32_hrp_expand(hrp) + data)
+    if const not in (BECH32_CONST, BECH32M_CONST):
+        raise AddressError('Invalid checksum: {}'.format(address))
+
+    witness_version = data[0]
+    witness_program = _convert_bits(data[1:-6], 5, 8, False)
+    if (witness_program is None or witness_version > 16 or
+            not 2 <= len(witness_program) <= 40 or
+            (witness_version == 0 and len(witness_program) not in (20, 32))):
+        raise AddressError('Invalid witness program: {}'.format(address))
+    expected_const = BECH32_CONST if witness_version == 0 else BECH32M_CONST
+    if const != expected_const:
+        raise AddressError('Invalid checksum: {}'.format(address))
+    return witness_version, bytes(witness_program)
+
+
+def _b58encode_check(data: bytes) -> str:
+    address = base58.b58encode_check(data)
+    # base58>=1.0 returns bytes
+    if isinstance(address, bytes):
+        address = address.decode('ascii')
+    return address
+
+
+def script_to_address(script: Script, network: Network) -> Optional[str]:
+    """Address of a pubkey script, None if the script has no address form.
+
+    Pay-to-pubkey scripts are encoded as the pay-to-pubkey-hash address of
+    their public key.
+
+    """
+    if script.type is ScriptType.p2pkh:
+        return _b58encode_check(network.pubkey_address_prefix + script.hash)
+    if script.type is ScriptType.p2pk:
+        return _b58encode_check(
+            network.pubkey_address_prefix + hash160(script.public_keys[0])
+        )
+    if script.type is ScriptType.p2sh:
+        return _b58encode_check(network.script_address_prefix + script.hash)
+    if script.witness_version is not None:
+        return encode_segwit_address(
+            network.bech32_hrp,
+            script.witness_version,
+            script.witness_program,
+        )
+    return None
+
+
+def address_to_script_pub_key(address: str, network: Network) -> bytes:
+    """Pubkey script paying to `address`.
+
+    :raises AddressError: if the address is malformed or does not belong to
+        `network`.
+
+    """
+    if address.lower().startswith(network.bech32_hrp + '1'):
+        witness_version, witness_program = decode_segwit_address(
+            network.bech32_hrp,
+            address,
+        )
+        version_opcode = witness_version + 0x50 if witness_version else 0
+        return b''.join([
+            bytes([version_opcode, len(witness_program)]),
+            witness_program,
+        ])
+
+    try:
+        data = base58.b58decode_check(address)
+    except ValueError:
+        raise AddressError('Malformed base58 address: {}'.format(address))
+    if len(data) != 21:
+        raise AddressError('Malformed base58 address: {}'.format(address))
+
+    prefix, address_hash = data[:1], data[1:]
+    if prefix == network.pubkey_address_prefix:
+        # OP_DUP OP_HASH160 <hash> OP_EQUALVERIFY OP_CHECKSIG
+        return b'\x76\xa9\x14' + address_hash + b'\x88\xac'
+    if prefix == network.script_address_prefix:
+        # OP_HASH160 <hash> OP_EQUAL
+        return b'\xa9\x14' + address_hash + b'\x87'
+    raise AddressError(
+        'Address {} does not belong to {}'.format(address, network.name))
+
+
+def is_valid_address(address: str, network: Network) -> bool:
+    try:
+        address_to_script_pub_key(address, network)
+    except AddressError:
+        return False
+    return True
@@ -8,9 +8,11 @@ According to https://bitcoin.org/en/developer-reference#block-headers
 from datetime import datetime
 import hashlib
 import struct
-from typing import Sequence
+from typing import Optional, Sequence
 
-import base58
+from .address import script_to_address
+from .constants import Network
+from .script import Script, parse_script
 
 
 def varint(data: memoryview, offset: int) -> (int, int):
@@ -214,12 +216,13 @@ class TransactionOutput(object):
     https://bitcoin.org/en/developer-reference#txout
 
     """
-    __slots__ = ['value', 'script_pub_key']
+    __slots__ = ['value', 'script_pub_key', 'network']
 
     def __init__(
             self,
             value: int,
             script_pub_key: bytes,
+            network: Optional[Network] = None,
     ):
         """
         :param value: Number of satoshis to spend. May be zero; the sum of all
@@ -227,41 +230,48 @@ class TransactionOutput(object):
             outpoints provided in the input section.
         :param script_pub_key: Defines the conditions which must be satisfied
             to spend this output.
+        :param network: Network the output belongs to, used to encode its
+            address.
 
         """
         self.value = value
         self.script_pub_key = script_pub_key
+        self.network = network
 
     @property
-    def address(self):
-        # pattern 1: uncompressed ECDSA digital signature of 65 bytes
-        if len(self.script_pub_key) == 67 and self.script_pub_key[0] == 65:
-            ripemd160_bin_pub_key = hashlib.new(
-                'ripemd160',
-                hashlib.sha256(
-                    # strip first byte 0x41 and last byte OP_CHECKSIG
-                    self.script_pub_key[1:-1]
-                ).digest()
-            ).digest()
-
-            # network id byte
-            hash_bin_pub_key = b'\x00' + ripemd160_bin_pub_key
-
-            checksum = hashlib.sha256(
-                hashlib.sha256(hash_bin_pub_key).digest()
-            ).digest()
-            bin_address = b''.join([hash_bin_pub_key, checksum[:4]])
-
-            address = base58.b58encode(bin_address)
-            return address
-        else:
-            raise NotImplemented()
+    def script(self) -> Script:
+        """Tokenized pubkey script, shared between identical scripts."""
+        return parse_script(self.script_pub_key)
+
+    @property
+    def address(self) -> Optional[str]:
+        """Base58 or bech32 address of the output, None for scripts without
+        an address form such as OP_RETURN or bare multisig.
+
+        Raises ValueError if the output has no network, e.g. it was built
+        without one or read from a block with an unknown magic number; use
+        `get_address` to pass the network explicitly.
+
+        """
+        return self.get_address()
+
+    def get_address(self, network: Optional[Network] = None) -> Optional[str]:
+        """Address of the output for `network`, defaults to the network the
+        output was read from.
+
+        """
+        if network is None:
+            network = self.network
+        if network is None:
+            raise ValueError('Unknown network, cannot encode an address')
+        return script_to_address(self.script, network)
 
     @classmethod
     def from_binary_data(
             cls,
             data: memoryview,
             offset: int,
+            network: Optional[Network] = None,
     ):
         value_fmt = '<q'
         value, = struct.unpack_from(value_fmt, data, offset=offset)
@@ -273,7 +283,7 @@ class TransactionOutput(object):
         public_key, = struct.unpack_from(public_key_fmt, data, offset=offset)
         offset += struct.calcsize(public_key_fmt)
 
-        return cls(value, public_key), offset
+        return cls(value, public_key, network), offset
 
 
 class Transaction(object):
@@ -326,6 +336,7 @@ class Transaction(object):
             data: memoryview,
             txn_index: int,
             offset: int,
+            network: Optional[Network] = None,
     ):
         initial_offset = offset
         version_fmt = '<I'
@@ -351,6 +362,7 @@ class Transaction(object):
             txn_output, offset = TransactionOutput.from_binary_data(
                 data,
                 offset=offset,
+                network=network,
             )
             txn_output_list.append(txn_output)
 
@@ -368,15 +380,17 @@ class Transaction(object):
 
 
 class Block(object):
-    __slots__ = ['header', 'transactions']
+    __slots__ = ['header', 'transactions', 'network']
 
     def __init__(
             self,
             header: BlockHeader,
             transactions: Sequence[Transaction],
+            network: Optional[Network] = None,
     ):
         self.header = header
         self.transactions = transactions
+        self.network = network
 
     @property
     def hashcash(self) -> str:
@@ -406,11 +420,19 @@ class Block(object):
             cls,
             block_data: memoryview,
             offset: int,
+            network: Optional[Network] = None,
     ):
+        """
+        :param network: Network of the block, detected from the magic number
+            when not given.
+
+        """
         header, offset = BlockHeader.from_binary_data(
             block_data,
             offset=offset,
         )
+        if network is None:
+            network = Network.from_magic_number(header.magic_number)
 
         txn_count, offset = varint(block_data, offset=offset)
 
@@ -420,7 +442,8 @@ class Block(object):
                 block_data,
                 txn_index=i,
                 offset=offset,
+                network=network,
             )
             transaction_list.append(transaction)
 
-        return cls(header, transaction_list)
+        return cls(header, transaction_list, network)
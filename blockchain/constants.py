@@ -1,4 +1,5 @@
 from enum import Enum
+from typing import Optional
 
 
 class Network(Enum):
@@ -10,3 +11,57 @@ class Network(Enum):
     mainnet = 0xd9b4bef9
     testnet = 0x0709110b
     regtest = 0xdab5bffa
+
+    @classmethod
+    def from_magic_number(cls, magic_number: int) -> Optional['Network']:
+        """Network for a block magic number, None if it is not known."""
+        try:
+            return cls(magic_number)
+        except ValueError:
+            return None
+
+    @property
+    def magic_number(self) -> int:
+        return self.value
+
+    @property
+    def pubkey_address_prefix(self) -> bytes:
+        """Version byte of base58 pay-to-pubkey-hash addresses."""
+        return _network_params[self][0]
+
+    @property
+    def script_address_prefix(self) -> bytes:
+        """Version byte of base58 pay-to-script-hash addresses."""
+        return _network_params[self][1]
+
+    @property
+    def bech32_hrp(self) -> str:
+        """Human-readable part of bech32 segwit addresses."""
+        return _network_params[self][2]
+
+    @property
+    def genesis_hash(self) -> str:
+        """Hash of the first block, same byte order as `Block.hashcash`."""
+        return _network_params[self][3]
+
+
+_network_params = {
+    Network.mainnet: (
+        b'\x00',
+        b'\x05',
+        'bc',
+        '000000000019d6689c085ae165831e934ff763ae46a2a6c172b3f1b60a8ce26f',
+    ),
+    Network.testnet: (
+        b'\x6f',
+        b'\xc4',
+        'tb',
+        '000000000933ea01ad0ee984209779baaec3ced90fa3f408719526f8d77f4943',
+    ),
+    Network.regtest: (
+        b'\x6f',
+        b'\xc4',
+        'bcrt',
+        '0f9188f13cb7b2c71f2a335e3a4fc328bf5beb436012afca590b1a11466e2206',
+    ),
+}
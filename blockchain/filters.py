@@ -0,0 +1,286 @@
+"""Predicates evaluated against raw block data before anything is decoded.
+
+Header predicates are checked against the fixed 80-byte header layout, so a
+block which does not match is skipped without touching its transactions.
+Transaction predicates are checked against the raw output bytes, so only
+transactions with a matching output are turned into `Transaction` objects.
+
+"""
+import hashlib
+import struct
+from typing import Iterable, List, Optional, Tuple
+
+from .block import varint
+
+
+# magic number (4 bytes) + block size (4 bytes) precede the block header
+HEADER_OFFSET = 8
+HEADER_SIZE = 80
+
+NULL_HASH = bytes(32)
+
+_version_fmt = '<I'
+_version_offset = HEADER_OFFSET
+_previous_hash_offset = HEADER_OFFSET + 4
+_timestamp_fmt = '<I'
+_timestamp_offset = HEADER_OFFSET + 4 + 32 + 32
+
+
+def header_hash(data: memoryview, offset: int) -> bytes:
+    """SHA256(SHA256()) of the block header in internal byte order.
+
+    :param offset: Offset of the block, i.e. of its magic number.
+
+    """
+    header_start = offset + HEADER_OFFSET
+    return hashlib.sha256(
+        hashlib.sha256(data[header_start:header_start + HEADER_SIZE]).digest()
+    ).digest()
+
+
+def previous_hash(data: memoryview, offset: int) -> bytes:
+    """Previous block hash in internal byte order, read without decoding."""
+    hash_start = offset + _previous_hash_offset
+    return bytes(data[hash_start:hash_start + 32])
+
+
+class BlockHeights(object):
+    """Block heights derived from previous block hashes.
+
+    Block files are not in chain order and a child block may be stored in
+    an earlier file than its parent. Blocks read before their parent are
+    kept as orphans, with a copy of their raw data, until a later block
+    gives the parent a height. Share one instance between the readers of
+    consecutive block files.
+
+    """
+    __slots__ = ['heights', 'orphans']
+
+    def __init__(self):
+        # block hash -> height
+        self.heights = {}
+        # parent hash -> [(block hash, raw block)]
+        self.orphans = {}
+
+    @property
+    def orphan_count(self) -> int:
+        """Number of blocks still waiting for their parent."""
+        return sum(len(children) for children in self.orphans.values())
+
+    def child_height(self, parent_hash: bytes) -> Optional[int]:
+        """Height of a block with the given parent, None if unknown."""
+        if parent_hash == NULL_HASH:
+            return 0
+        parent_height = self.heights.get(parent_hash)
+        if parent_height is None:
+            return None
+        return parent_height + 1
+
+    def add_orphan(
+            self,
+            parent_hash: bytes,
+            block_hash: bytes,
+            block_bin: bytes,
+    ):
+        """
+        :param block_bin: Raw block starting at its magic number, copied so
+            it outlives the block file mapping.
+
+        """
+        self.orphans.setdefault(parent_hash, []).append(
+            (block_hash, block_bin))
+
+    def resolve(
+            self,
+            block_hash: bytes,
+            height: int,
+    ) -> List[Tuple[bytes, int, bytes]]:
+        """Record the height of a block and of every orphan descending from
+        it. Returns `(block hash, height, raw block)` of the resolved
+        orphans.
+
+        """
+        self.heights[block_hash] = height
+        resolved = []
+        pending = [(block_hash, height)]
+        while pending:
+            parent_hash, parent_height = pending.pop()
+            for child_hash, child_bin in self.orphans.pop(parent_hash, []):
+                self.heights[child_hash] = parent_height + 1
+                resolved.append((child_hash, parent_height + 1, child_bin))
+                pending.append((child_hash, parent_height + 1))
+        return resolved
+
+
+class BlockFilter(object):
+    """Block and transaction predicates for `BlockchainFileReader`.
+
+    All given predicates must match. Ranges are inclusive, `None` disables a
+    predicate.
+
+    Heights are not stored in the block data, they are derived by the reader
+    from the previous block hash, see `BlockHeights`. A block read before
+    its parent is held back and yielded, out of file order, once the parent
+    is read, possibly by the reader of a later file sharing the same
+    `BlockHeights`. Blocks whose parent is never read stay in
+    `BlockHeights.orphans`.
+
+    When any transaction predicate is set, a block matches only if at least
+    one of its transactions does and `Block.transactions` holds only the
+    matching transactions. A transaction matches if at least one of its
+    outputs satisfies every transaction predicate.
+
+    """
+    __slots__ = [
+        'min_timestamp',
+        'max_timestamp',
+        'versions',
+        'min_height',
+        'max_height',
+        'block_hashes',
+        'script_prefixes',
+        'min_value',
+    ]
+
+    def __init__(
+            self,
+            min_timestamp: Optional[int] = None,
+            max_timestamp: Optional[int] = None,
+            versions: Optional[Iterable[int]] = None,
+            min_height: Optional[int] = None,
+            max_height: Optional[int] = None,
+            block_hashes: Optional[Iterable[str]] = None,
+            script_prefixes: Optional[Iterable[bytes]] = None,
+            min_value: Optional[int] = None,
+    ):
+        """
+        :param min_timestamp: Earliest block time, Unix epoch time.
+        :param max_timestamp: Latest block time, Unix epoch time.
+        :param versions: Accepted block version numbers.
+        :param min_height: Lowest block height.
+        :param max_height: Highest block height.
+        :param block_hashes: Accepted block hashes as hex strings in the same
+            byte order as `Block.hashcash`.
+        :param script_prefixes: Accepted prefixes of an output pubkey script.
+        :param min_value: Lowest output value in satoshis.
+
+        """
+        self.min_timestamp = min_timestamp
+        self.max_timestamp = max_timestamp
+        self.versions = (
+            frozenset(versions) if versions is not None else None
+        )
+        self.min_height = min_height
+        self.max_height = max_height
+        self.block_hashes = (
+            frozenset(bytes.fromhex(h)[::-1] for h in block_hashes)
+            if block_hashes is not None else None
+        )
+        self.script_prefixes = (
+            tuple(bytes(p) for p in script_prefixes)
+            if script_prefixes is not None else None
+        )
+        self.min_value = min_value
+
+    @property
+    def needs_height(self) -> bool:
+        return self.min_height is not None or self.max_height is not None
+
+    @property
+    def filters_transactions(self) -> bool:
+        return self.script_prefixes is not None or self.min_value is not None
+
+    def match_header(
+            self,
+            data: memoryview,
+            offset: int,
+            block_hash: Optional[bytes] = None,
+            height: Optional[int] = None,
+    ) -> bool:
+        """Check the header predicates of the block at `offset`.
+
+        Version and time are checked first, the header is only hashed if
+        they match and `block_hash` is not given.
+
+        :param block_hash: Result of `header_hash` if already computed.
+        :param height: Block height if known.
+
+        """
+        if self.versions is not None:
+            version, = struct.unpack_from(
+                _version_fmt, data, offset=offset + _version_offset)
+            if version not in self.versions:
+                return False
+
+        if self.min_timestamp is not None or self.max_timestamp is not None:
+            timestamp, = struct.unpack_from(
+                _timestamp_fmt, data, offset=offset + _timestamp_offset)
+            if (self.min_timestamp is not None and
+                    timestamp < self.min_timestamp):
+                return False
+            if (self.max_timestamp is not None and
+                    timestamp > self.max_timestamp):
+                return False
+
+        if self.block_hashes is not None:
+            if block_hash is None:
+                block_hash = header_hash(data, offset)
+            if block_hash not in self.block_hashes:
+                return False
+
+        if self.needs_height:
+            if height is None:
+                return False
+            if self.min_height is not None and height < self.min_height:
+                return False
+            if self.max_height is not None and height > self.max_height:
+                return False
+
+        return True
+
+    def match_output(self, value: int, script_pub_key: memoryview) -> bool:
+        if self.min_value is not None and value < self.min_value:
+            return False
+        if self.script_prefixes is not None:
+            for prefix in self.script_prefixes:
+                if script_pub_key[:len(prefix)] == prefix:
+                    return True
+            return False
+        return True
+
+    def scan_transaction(
+            self,
+            data: memoryview,
+            offset: int,
+    ) -> (bool, int):
+        """Walk the raw transaction at `offset` without building objects.
+
+        Returns whether any output matches and the offset of the next
+        transaction.
+
+        """
+        # unsigned int32 version
+        offset += 4
+
+        txn_input_count, offset = varint(data, offset=offset)
+        for i in range(txn_input_count):
+            # 32 bytes of previous hash, unsigned int32 output index
+            offset += 36
+            script_length, offset = varint(data, offset=offset)
+            # signature script, unsigned int32 sequence number
+            offset += script_length + 4
+
+        matched = False
+        txn_output_count, offset = varint(data, offset=offset)
+        for i in range(txn_output_count):
+            value, = struct.unpack_from('<q', data, offset=offset)
+            offset += 8
+            script_length, offset = varint(data, offset=offset)
+            script_end = offset + script_length
+            if not matched:
+                matched = self.match_output(value, data[offset:script_end])
+            offset = script_end
+
+        # unsigned int32 lock time
+        offset += 4
+        return matched, offset
@@ -1,39 +1,237 @@
 import mmap
+import os
 import struct
+from typing import Optional
 
-from .block import Block
+from .block import Block, BlockHeader, Transaction, varint
+from .constants import Network
+from .filters import (
+    NULL_HASH,
+    BlockFilter,
+    BlockHeights,
+    header_hash,
+    previous_hash,
+)
 
 
 class BlockchainFileReader(object):
-    def __init__(self, file_name):
+    def __init__(
+            self,
+            file_name,
+            block_filter: BlockFilter = None,
+            network: Network = None,
+            strict: bool = False,
+            heights: BlockHeights = None,
+    ):
+        """
+        :param file_name: Path to a blkNNNNN.dat file.
+        :param block_filter: Optional predicates; only matching blocks and
+            transactions are decoded and yielded.
+        :param network: Network of the file. Detected from the magic number
+            of the first block when not given.
+        :param strict: Raise ValueError for a block whose magic number does
+            not match the network, or for a block without a previous block
+            which is not the genesis block of the network, instead of
+            decoding it. Costs an int and an in-place 32-byte comparison per
+            block, and hashing the header of blocks without a previous block.
+        :param heights: Known heights and orphan blocks, used and extended
+            when `block_filter` has a height range. Pass the same instance to
+            the readers of consecutive files so that heights and orphans
+            carry over between files. Orphans still unresolved after a file
+            are reported by `heights.orphan_count` and `heights.orphans`.
+
+        """
         self._file_name = file_name
+        self._block_filter = block_filter
+        self._strict = strict
+        self.network = network
+        self.heights = heights if heights is not None else BlockHeights()
+
+    def detect_network(self) -> Optional[Network]:
+        """Set and return the network from the first magic number of the
+        file. Returns None for unknown magic numbers.
+
+        """
+        if self.network is None:
+            with open(self._file_name, 'rb') as f:
+                magic_number_bin = f.read(4)
+            if len(magic_number_bin) == 4:
+                magic_number, = struct.unpack('<I', magic_number_bin)
+                self.network = Network.from_magic_number(magic_number)
+        return self.network
 
     def __iter__(self):
-        """TODO: Possibly inefficient implementation."""
         with open(self._file_name, 'rb') as f:
-            # Map for 8MB block size
+            # mmap cannot map an empty file
+            if not os.fstat(f.fileno()).st_size:
+                return
             mmap_length = 0
             blockchain_mmap = mmap.mmap(
                 f.fileno(),
                 mmap_length,
                 access=mmap.ACCESS_READ,
             )
-            file_size = blockchain_mmap.size()
-            offset = 0
-            # linit - 8 MB
-            limit = 8 * 1024 * 1024
-            while offset < file_size:
-                # TODO: no need in memory view?
-                blockchain_mview = memoryview(
-                    blockchain_mmap[offset:offset + limit]
+            blockchain_mview = memoryview(blockchain_mmap)
+            try:
+                yield from self._iter_blocks(blockchain_mview)
+            finally:
+                blockchain_mview.release()
+                blockchain_mmap.close()
+
+    def _iter_blocks(self, blockchain_mview: memoryview):
+        block_filter = self._block_filter
+        track_heights = block_filter is not None and block_filter.needs_height
+        file_size = len(blockchain_mview)
+
+        offset = 0
+        network = self.network
+        expected_magic_number = None
+        while offset < file_size:
+            try:
+                magic_number, block_size = struct.unpack_from(
+                    '<II', blockchain_mview, offset=offset)
+                if magic_number == 0:
+                    # Bitcoin Core preallocates block files with zeros
+                    break
+                if offset + 8 + block_size > file_size:
+                    raise struct.error('block exceeds file size')
+                if expected_magic_number is None:
+                    if network is None:
+                        network = Network.from_magic_number(magic_number)
+                        self.network = network
+                    expected_magic_number = (
+                        network.magic_number if network is not None
+                        else magic_number
+                    )
+                if self._strict and magic_number != expected_magic_number:
+                    raise ValueError(
+                        'Unexpected magic number {:#010x} at offset {}, '
+                        'expected {:#010x}'.format(
+                            magic_number, offset, expected_magic_number))
+                # magic number, block size and version precede it
+                previous_hash_offset = offset + 12
+                if (self._strict and network is not None and
+                        blockchain_mview[
+                            previous_hash_offset:previous_hash_offset + 32
+                        ] == NULL_HASH):
+                    block_hash = header_hash(blockchain_mview, offset)
+                    if block_hash[::-1].hex() != network.genesis_hash:
+                        raise ValueError(
+                            'Block {} at offset {} has no previous block but '
+                            'is not the {} genesis block'.format(
+                                block_hash[::-1].hex(), offset, network.name))
+                if block_filter is None:
+                    blocks = [Block.from_binary_data(
+                        blockchain_mview,
+                        offset=offset,
+                        network=network,
+                    )]
+                elif track_heights:
+                    blocks = self._resolve_heights(
+                        blockchain_mview,
+                        offset=offset,
+                        block_size=block_size,
+                        network=network,
+                    )
+                else:
+                    blocks = [self._filter_block(
+                        blockchain_mview,
+                        offset=offset,
+                        network=network,
+                    )]
+            except struct.error as err:
+                raise ValueError(
+                    'Truncated block at offset {} of {} bytes in {}'.format(
+                        offset, file_size, self._file_name)) from err
+            for block in blocks:
+                if block is not None:
+                    yield block
+            # block size + 4 bytes magic number + 4 bytes block size
+            offset += block_size + 8
+
+    def _resolve_heights(
+            self,
+            data: memoryview,
+            offset: int,
+            block_size: int,
+            network: Optional[Network],
+    ) -> list:
+        """Assign a height to the block at `offset` and to every orphan
+        waiting for it, returning the matching blocks.
+
+        A block whose parent has no height yet is copied into the orphans of
+        `self.heights`.
+
+        """
+        block_hash = header_hash(data, offset)
+        parent_hash = previous_hash(data, offset)
+        height = self.heights.child_height(parent_hash)
+        if height is None:
+            self.heights.add_orphan(
+                parent_hash,
+                block_hash,
+                # block size + 4 bytes magic number + 4 bytes block size
+                bytes(data[offset:offset + block_size + 8]),
+            )
+            return []
+
+        blocks = [self._filter_block(
+            data,
+            offset=offset,
+            network=network,
+            block_hash=block_hash,
+            height=height,
+        )]
+        for child_hash, child_height, child_bin in self.heights.resolve(
+                block_hash, height):
+            blocks.append(self._filter_block(
+                memoryview(child_bin),
+                offset=0,
+                network=network,
+                block_hash=child_hash,
+                height=child_height,
+            ))
+        return blocks
+
+    def _filter_block(
+            self,
+            data: memoryview,
+            offset: int,
+            network: Optional[Network],
+            block_hash: Optional[bytes] = None,
+            height: Optional[int] = None,
+    ):
+        block_filter = self._block_filter
+
+        if not block_filter.match_header(data, offset, block_hash, height):
+            return None
+
+        if not block_filter.filters_transactions:
+            return Block.from_binary_data(
+                data,
+                offset=offset,
+                network=network,
+            )
+
+        header, offset = BlockHeader.from_binary_data(data, offset=offset)
+        txn_count, offset = varint(data, offset=offset)
+
+        transaction_list = []
+        for i in range(txn_count):
+            matched, next_offset = block_filter.scan_transaction(
+                data,
+                offset=offset,
+            )
+            if matched:
+                transaction, _ = Transaction.from_binary_data(
+                    data,
+                    txn_index=i,
+                    offset=offset,
+                    network=network,
                 )
-                try:
-                    block = Block.from_binary_data(blockchain_mview, offset=0)
-                except struct.error as err:
-                    print('Current mmap position: ', blockchain_mmap.tell())
-                    print('Total mmap size: ', blockchain_mmap.size())
-                    raise err
-                yield block
-                offset += block.total_size
-                blockchain_mmap.seek(block.total_size)
-            blockchain_mmap.close()
+                transaction_list.append(transaction)
+            offset = next_offset
+
+        if not transaction_list:
+            return None
+        return Block(header, transaction_list, network)
@@ -0,0 +1,281 @@
+"""Bitcoin script tokenizer and standard template classification.
+
+Reference:
+https://en.bitcoin.it/wiki/Script
+https://github.com/bitcoin/bitcoin/blob/master/src/script/standard.cpp
+
+"""
+from enum import Enum
+from functools import lru_cache
+import struct
+from typing import Iterator, Optional, Sequence, Tuple
+
+
+OP_0 = 0x00
+OP_PUSHDATA1 = 0x4c
+OP_PUSHDATA2 = 0x4d
+OP_PUSHDATA4 = 0x4e
+OP_1NEGATE = 0x4f
+OP_RESERVED = 0x50
+OP_1 = 0x51
+OP_16 = 0x60
+OP_RETURN = 0x6a
+OP_DUP = 0x76
+OP_EQUAL = 0x87
+OP_EQUALVERIFY = 0x88
+OP_HASH160 = 0xa9
+OP_CHECKSIG = 0xac
+OP_CHECKMULTISIG = 0xae
+
+# Number of parsed scripts kept by `parse_script`
+SCRIPT_CACHE_SIZE = 64 * 1024
+
+_pushdata_fmt = {
+    OP_PUSHDATA1: '<B',
+    OP_PUSHDATA2: '<H',
+    OP_PUSHDATA4: '<I',
+}
+
+
+class ScriptError(ValueError):
+    """Raised when a push runs past the end of the script."""
+
+
+class ScriptType(Enum):
+    nonstandard = 'nonstandard'
+    p2pk = 'pubkey'
+    p2pkh = 'pubkeyhash'
+    p2sh = 'scripthash'
+    multisig = 'multisig'
+    null_data = 'nulldata'
+    p2wpkh = 'witness_v0_keyhash'
+    p2wsh = 'witness_v0_scripthash'
+    p2tr = 'witness_v1_taproot'
+    witness_unknown = 'witness_unknown'
+
+
+def tokenize(script: bytes) -> Iterator[Tuple[int, Optional[memoryview]]]:
+    """Yield `(opcode, data)` pairs of a script.
+
+    `data` is a memoryview into `script` for push opcodes, so nothing is
+    copied, and None for every other opcode. OP_0 yields an empty push.
+
+    """
+    data = memoryview(script)
+    length = len(data)
+    offset = 0
+    while offset < length:
+        opcode = data[offset]
+        offset += 1
+
+        if opcode > OP_PUSHDATA4:
+            yield opcode, None
+            continue
+
+        if opcode < OP_PUSHDATA1:
+            push_length = opcode
+        else:
+            length_fmt = _pushdata_fmt[opcode]
+            length_end = offset + struct.calcsize(length_fmt)
+            if length_end > length:
+                raise ScriptError(
+                    'Truncated push length at offset {}'.format(offset - 1))
+            push_length, = struct.unpack_from(length_fmt, data, offset=offset)
+            offset = length_end
+
+        push_end = offset + push_length
+        if push_end > length:
+            raise ScriptError(
+                'Push of {} bytes at offset {} exceeds script length {}'
+                .format(push_length, offset, length))
+        yield opcode, data[offset:push_end]
+        offset = push_end
+
+
+def small_int(opcode: int) -> Optional[int]:
+    """Value of OP_0 and OP_1..OP_16, None for any other opcode."""
+    if opcode == OP_0:
+        return 0
+    if OP_1 <= opcode <= OP_16:
+        return opcode - OP_1 + 1
+    return None
+
+
+def _is_push_only(tokens: Sequence) -> bool:
+    # same as CScript::IsPushOnly, OP_RESERVED counts as a push
+    return all(opcode <= OP_16 for opcode, _ in tokens)
+
+
+def _is_public_key(opcode: int, data: Optional[memoryview]) -> bool:
+    # direct push of a key whose size matches its prefix, like
+    # CPubKey::ValidSize; 0x06 and 0x07 are hybrid uncompressed keys
+    return data is not None and opcode == len(data) and (
+        (opcode == 33 and data[0] in (2, 3)) or
+        (opcode == 65 and data[0] in (4, 6, 7))
+    )
+
+
+def _classify(raw: bytes, tokens: Sequence) -> ScriptType:
+    length = len(raw)
+
+    if (length == 25 and raw[0] == OP_DUP and raw[1] == OP_HASH160 and
+            raw[2] == 20 and raw[23] == OP_EQUALVERIFY and
+            raw[24] == OP_CHECKSIG):
+        return ScriptType.p2pkh
+
+    if (length == 23 and raw[0] == OP_HASH160 and raw[1] == 20 and
+            raw[22] == OP_EQUAL):
+        return ScriptType.p2sh
+
+    if (length and raw[0] == OP_RETURN and tokens is not None and
+            _is_push_only(tokens[1:])):
+        return ScriptType.null_data
+
+    # version byte followed by a single 2 to 40 byte push
+    if 4 <= length <= 42 and raw[1] == length - 2:
+        witness_version = small_int(raw[0])
+        if witness_version == 0:
+            if length == 22:
+                return ScriptType.p2wpkh
+            if length == 34:
+                return ScriptType.p2wsh
+        elif witness_version == 1 and length == 34:
+            return ScriptType.p2tr
+        elif witness_version is not None:
+            return ScriptType.witness_unknown
+
+    if tokens is None:
+        return ScriptType.nonstandard
+
+    if (len(tokens) == 2 and tokens[1][0] == OP_CHECKSIG and
+            _is_public_key(*tokens[0])):
+        return ScriptType.p2pk
+
+    if len(tokens) >= 4 and tokens[-1][0] == OP_CHECKMULTISIG:
+        required = small_int(tokens[0][0])
+        total = small_int(tokens[-2][0])
+        public_keys = tokens[1:-2]
+        if (required and total and required <= total == len(public_keys) and
+                all(_is_public_key(*token) for token in public_keys)):
+            return ScriptType.multisig
+
+    return ScriptType.nonstandard
+
+
+class Script(object):
+    """Tokenized and classified script.
+
+    Instances returned by `parse_script` are shared between every output
+    with the same script and must be treated as read-only.
+
+    """
+    __slots__ = ['raw', 'type', 'tokens']
+
+    def __init__(
+            self,
+            raw: bytes,
+            script_type: ScriptType,
+            tokens: Optional[Tuple[Tuple[int, Optional[memoryview]], ...]],
+    ):
+        """
+        :param raw: Serialized script.
+        :param script_type: Standard template the script matches.
+        :param tokens: `(opcode, data)` pairs as returned by `tokenize`, None
+            if the script is malformed.
+
+        """
+        self.raw = raw
+        self.type = script_type
+        self.tokens = tokens
+
+    @property
+    def is_valid(self) -> bool:
+        return self.tokens is not None
+
+    @property
+    def hash(self) -> Optional[bytes]:
+        """Public key hash, script hash or witness program."""
+        if self.type is ScriptType.p2pkh:
+            return self.raw[3:23]
+        if self.type is ScriptType.p2sh:
+            return self.raw[2:22]
+        return self.witness_program
+
+    @property
+    def witness_version(self) -> Optional[int]:
+        if self.type in (ScriptType.p2wpkh, ScriptType.p2wsh,
+                         ScriptType.p2tr, ScriptType.witness_unknown):
+            return small_int(self.raw[0])
+        return None
+
+    @property
+    def witness_program(self) -> Optional[bytes]:
+        if self.witness_version is None:
+            return None
+        return self.raw[2:]
+
+    @property
+    def public_keys(self) -> Sequence[bytes]:
+        if self.type is ScriptType.p2pk:
+            return [bytes(self.tokens[0][1])]
+        if self.type is ScriptType.multisig:
+            return [bytes(data) for _, data in self.tokens[1:-2]]
+        return []
+
+    @property
+    def required_signatures(self) -> Optional[int]:
+        if self.type is ScriptType.multisig:
+            return small_int(self.tokens[0][0])
+        if self.type in (ScriptType.p2pk, ScriptType.p2pkh,
+                         ScriptType.p2wpkh):
+            return 1
+        return None
+
+    @property
+    def op_return_data(self) -> Optional[bytes]:
+        """Concatenated pushes following OP_RETURN.
+
+        OP_1NEGATE and OP_1..OP_16 contribute the single byte of their
+        minimally encoded script number (0x81 and 0x01..0x10), OP_RESERVED
+        contributes nothing. Returns None for non OP_RETURN scripts.
+
+        """
+        if self.type is not ScriptType.null_data:
+            return None
+        payload = []
+        for opcode, data in self.tokens[1:]:
+            if data is not None:
+                payload.append(data)
+            elif opcode == OP_1NEGATE:
+                payload.append(b'\x81')
+            elif opcode != OP_RESERVED:
+                payload.append(bytes([small_int(opcode)]))
+        return b''.join(payload)
+
+
+@lru_cache(maxsize=SCRIPT_CACHE_SIZE)
+def _parse_script(raw: bytes) -> Script:
+    try:
+        tokens = tuple(tokenize(raw))
+    except ScriptError:
+        tokens = None
+    return Script(raw, _classify(raw, tokens), tokens)
+
+
+def parse_script(raw: bytes) -> Script:
+    """Tokenize and classify a script.
+
+    Results are cached by script bytes; identical scripts return the same
+    `Script` instance. Any other buffer such as a memoryview is copied to
+    `bytes` first, so cached scripts never keep the source buffer alive.
+    Use `parse_script.cache_info()` and `parse_script.cache_clear()` to
+    inspect and reset the cache.
+
+    """
+    if type(raw) is not bytes:
+        raw = bytes(raw)
+    return _parse_script(raw)
+
+
+parse_script.cache_info = _parse_script.cache_info
+parse_script.cache_clear = _parse_script.cache_clear
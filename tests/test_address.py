@@ -0,0 +1,110 @@
+import pytest
+
+from blockchain.address import (
+    AddressError,
+    address_to_script_pub_key,
+    is_valid_address,
+    script_to_address,
+)
+from blockchain.block import TransactionOutput
+from blockchain.constants import Network
+from blockchain.script import parse_script
+
+
+@pytest.mark.parametrize('script_pub_key, network, address', [
+    (
+        '76a91462e907b15cbf27d5425399ebf6f0fb50ebb88f1888ac',
+        Network.mainnet,
+        '1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNa',
+    ),
+    (
+        '76a91462e907b15cbf27d5425399ebf6f0fb50ebb88f1888ac',
+        Network.testnet,
+        'mpXwg4jMtRhuSpVq4xS3HFHmCmWp9NyGKt',
+    ),
+    (
+        'a91462e907b15cbf27d5425399ebf6f0fb50ebb88f1887',
+        Network.mainnet,
+        '3Ai1JZ8pdJb2ksieUV8FsxSNVJCpoPi8W6',
+    ),
+    (
+        '0014751e76e8199196d454941c45d1b3a323f1433bd6',
+        Network.mainnet,
+        'bc1qw508d6qejxtdg4y5r3zarvary0c5xw7kv8f3t4',
+    ),
+    (
+        '00201863143c14c5166804bd19203356da136c985678cd4d27a1b8c6329604903262',
+        Network.testnet,
+        'tb1qrp33g0q5c5txsp9arysrx4k6zdkfs4nce4xj0gdcccefvpysxf3q0sl5k7',
+    ),
+    (
+        '512079be667ef9dcbbac55a06295ce870b07029bfcdb2dce28d959f2815b16f81798',
+        Network.mainnet,
+        'bc1p0xlxvlhemja6c4dqv22uapctqupfhlxm9h8z3k2e72q4k9hcz7vqzk5jj0',
+    ),
+])
+def test_address_round_trip(script_pub_key, network, address):
+    script_pub_key = bytes.fromhex(script_pub_key)
+
+    assert script_to_address(parse_script(script_pub_key), network) == address
+    assert address_to_script_pub_key(address, network) == script_pub_key
+    assert is_valid_address(address, network)
+
+
+def test_regtest_segwit_address():
+    script_pub_key = bytes.fromhex(
+        '0014751e76e8199196d454941c45d1b3a323f1433bd6')
+
+    address = script_to_address(parse_script(script_pub_key), Network.regtest)
+
+    assert address.startswith('bcrt1q')
+    assert address_to_script_pub_key(address, Network.regtest) == (
+        script_pub_key
+    )
+
+
+def test_no_address():
+    assert script_to_address(parse_script(b'\x6a\x00'), Network.mainnet) is (
+        None
+    )
+
+
+@pytest.mark.parametrize('address, network', [
+    ('1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNa', Network.testnet),
+    ('mpXwg4jMtRhuSpVq4xS3HFHmCmWp9NyGKt', Network.mainnet),
+    ('bc1qw508d6qejxtdg4y5r3zarvary0c5xw7kv8f3t4', Network.testnet),
+    ('bc1qw508d6qejxtdg4y5r3zarvary0c5xw7kv8f3t5', Network.mainnet),
+    ('1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNb', Network.mainnet),
+    ('not an address', Network.mainnet),
+])
+def test_invalid_address(address, network):
+    assert not is_valid_address(address, network)
+    with pytest.raises(AddressError):
+        address_to_script_pub_key(address, network)
+
+
+def test_output_address_network():
+    txn_output = TransactionOutput(
+        50 * (10 ** 8),
+        bytes.fromhex('76a91462e907b15cbf27d5425399ebf6f0fb50ebb88f1888ac'),
+    )
+
+    with pytest.raises(ValueError):
+        txn_output.address
+    assert txn_output.get_address(Network.mainnet) == (
+        '1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNa'
+    )
+
+    txn_output.network = Network.testnet
+    assert txn_output.address == 'mpXwg4jMtRhuSpVq4xS3HFHmCmWp9NyGKt'
+    assert txn_output.get_address(Network.mainnet) == (
+        '1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNa'
+    )
+
+
+def test_hybrid_key_address():
+    txn_output = TransactionOutput(
+        0, b'\x41\x07' + bytes(range(64)) + b'\xac', Network.mainnet)
+
+    assert txn_output.address is not None
+    assert txn_output.address.startswith('1')
@@ -1,51 +1,9 @@
 from datetime import datetime
 
-import pytest
-
 from blockchain.block import Block
 from blockchain.constants import Network
 
 
-@pytest.fixture
-def genesis_block():
-    """https://en.bitcoin.it/wiki/Genesis_block"""
-    genesis_block_hex = (
-        'f9beb4d91d01000001000000000000000000000000000000000000000000000000000'
-        '00000000000000000003ba3edfd7a7b12b27ac72c3e67768f617fc81bc3888a51323a'
-        '9fb8aa4b1e5e4a29ab5f49ffff001d1dac2b7c0101000000010000000000000000000'
-        '000000000000000000000000000000000000000000000ffffffff4d04ffff001d0104'
-        '455468652054696d65732030332f4a616e2f32303039204368616e63656c6c6f72206'
-        'f6e206272696e6b206f66207365636f6e64206261696c6f757420666f722062616e6b'
-        '73ffffffff0100f2052a01000000434104678afdb0fe5548271967f1a67130b7105cd'
-        '6a828e03909a67962e0ea1f61deb649f6bc3f4cef38c4f35504e51ec112de5c384df7'
-        'ba0b8d578a4c702b6bf11d5fac00000000'
-    )
-    return bytes.fromhex(genesis_block_hex)
-
-
-@pytest.fixture
-def block_170():
-    """Block #170 is the first block with 2 transactions"""
-    block_170_hex = (
-        'f9beb4d9ea0100000100000055bd840a78798ad0da853f68974f3d183e2bd1db6a842'
-        'c1feecf222a00000000ff104ccb05421ab93e63f8c3ce5c2c2e9dbb37de2764b3a317'
-        '5c8166562cac7d51b96a49ffff001d283e9e700201000000010000000000000000000'
-        '000000000000000000000000000000000000000000000ffffffff0704ffff001d0102'
-        'ffffffff0100f2052a01000000434104d46c4968bde02899d2aa0963367c7a6ce34ee'
-        'c332b32e42e5f3407e052d64ac625da6f0718e7b302140434bd725706957c092db538'
-        '05b821a85b23a7ac61725bac000000000100000001c997a5e56e104102fa209c6a852'
-        'dd90660a20b2d9c352423edce25857fcd3704000000004847304402204e45e16932b8'
-        'af514961a1d3a1a25fdf3f4f7732e9d624c6c61548ab5fb8cd410220181522ec8eca0'
-        '7de4860a4acdd12909d831cc56cbbac4622082221a8768d1d0901ffffffff0200ca9a'
-        '3b00000000434104ae1a62fe09c5f51b13905f07f06b99a2f7159b2225f374cd378d7'
-        '1302fa28414e7aab37397f554a7df5f142c21c1b7303b8a0626f1baded5c72a704f7e'
-        '6cd84cac00286bee0000000043410411db93e1dcdb8a016b49840f8c53bc1eb68a382'
-        'e97b1482ecad7b148a6909a5cb2e0eaddfb84ccf9744464f82e160bfa9b8b64f9d4c0'
-        '3f999b8643f656b412a3ac00000000'
-    )
-    return bytes.fromhex(block_170_hex)
-
-
 def test_genesis_block(genesis_block):
     blockchain_mview = memoryview(genesis_block)
     block = Block.from_binary_data(blockchain_mview, offset=0)
@@ -0,0 +1,219 @@
+import struct
+
+import pytest
+
+from blockchain.constants import Network
+from blockchain.filters import BlockFilter, BlockHeights
+from blockchain.reader import BlockchainFileReader
+
+
+GENESIS_HASH = (
+    '000000000019d6689c085ae165831e934ff763ae46a2a6c172b3f1b60a8ce26f'
+)
+BLOCK_1_HASH = (
+    '00000000839a8e6886ab5951d76f411475428afc90947ee320161bbf18eb6048'
+)
+BLOCK_170_HASH = (
+    '00000000d1145790a8694403d4063f323d499e655c83426834d4ce2f8dd4a2ee'
+)
+
+
+@pytest.fixture
+def blockchain_file(tmpdir, genesis_block, block_170):
+    path = tmpdir.join('blk00000.dat')
+    path.write_binary(genesis_block + block_170)
+    return str(path)
+
+
+def with_magic_number(block_bin, network):
+    return struct.pack('<I', network.magic_number) + block_bin[4:]
+
+
+def read(file_name, **kwargs):
+    block_filter = BlockFilter(**kwargs) if kwargs else None
+    return list(BlockchainFileReader(file_name, block_filter=block_filter))
+
+
+def test_no_filter(blockchain_file):
+    blocks = read(blockchain_file)
+
+    assert [b.hashcash for b in blocks] == [GENESIS_HASH, BLOCK_170_HASH]
+    assert [len(b.transactions) for b in blocks] == [1, 2]
+
+
+def test_timestamp_filter(blockchain_file):
+    # 2009-01-10 00:00:00 UTC
+    blocks = read(blockchain_file, min_timestamp=1231545600)
+    assert [b.hashcash for b in blocks] == [BLOCK_170_HASH]
+
+    blocks = read(blockchain_file, max_timestamp=1231545600)
+    assert [b.hashcash for b in blocks] == [GENESIS_HASH]
+
+
+def test_version_filter(blockchain_file):
+    assert len(read(blockchain_file, versions=[1])) == 2
+    assert read(blockchain_file, versions=[2]) == []
+
+
+def test_block_hash_filter(blockchain_file):
+    blocks = read(blockchain_file, block_hashes=[BLOCK_170_HASH])
+    assert [b.hashcash for b in blocks] == [BLOCK_170_HASH]
+
+
+def test_height_filter_unknown_parent(blockchain_file):
+    reader = BlockchainFileReader(
+        blockchain_file, block_filter=BlockFilter(min_height=0))
+
+    # parent of block 170 is not in the file, so its height is unknown
+    assert [b.hashcash for b in reader] == [GENESIS_HASH]
+    assert reader.heights.orphan_count == 1
+
+
+def test_height_filter_child_before_parent(tmpdir, genesis_block, block_1):
+    path = tmpdir.join('blk00000.dat')
+    path.write_binary(block_1 + genesis_block)
+
+    blocks = read(str(path), min_height=0, max_height=1000)
+    assert sorted(b.hashcash for b in blocks) == sorted([
+        GENESIS_HASH, BLOCK_1_HASH,
+    ])
+
+    blocks = read(str(path), min_height=1)
+    assert [b.hashcash for b in blocks] == [BLOCK_1_HASH]
+
+
+def test_height_filter_across_files(tmpdir, genesis_block, block_1):
+    first_path = tmpdir.join('blk00000.dat')
+    first_path.write_binary(genesis_block)
+    second_path = tmpdir.join('blk00001.dat')
+    second_path.write_binary(block_1)
+
+    heights = BlockHeights()
+    block_filter = BlockFilter(min_height=1)
+    assert list(BlockchainFileReader(
+        str(first_path), block_filter=block_filter, heights=heights)) == []
+    blocks = list(BlockchainFileReader(
+        str(second_path), block_filter=block_filter, heights=heights))
+
+    assert [b.hashcash for b in blocks] == [BLOCK_1_HASH]
+    assert heights.heights[bytes.fromhex(BLOCK_1_HASH)[::-1]] == 1
+
+
+def test_height_filter_child_in_earlier_file(tmpdir, genesis_block, block_1):
+    first_path = tmpdir.join('blk00000.dat')
+    first_path.write_binary(block_1)
+    second_path = tmpdir.join('blk00001.dat')
+    second_path.write_binary(genesis_block)
+
+    heights = BlockHeights()
+    block_filter = BlockFilter(min_height=0)
+    assert list(BlockchainFileReader(
+        str(first_path), block_filter=block_filter, heights=heights)) == []
+    assert heights.orphan_count == 1
+
+    blocks = list(BlockchainFileReader(
+        str(second_path), block_filter=block_filter, heights=heights))
+
+    assert [b.hashcash for b in blocks] == [GENESIS_HASH, BLOCK_1_HASH]
+    assert [len(b.transactions) for b in blocks] == [1, 1]
+    assert heights.orphan_count == 0
+
+
+def test_min_value_filter(blockchain_file):
+    blocks = read(blockchain_file, min_value=45 * (10 ** 8))
+
+    assert [b.hashcash for b in blocks] == [GENESIS_HASH, BLOCK_170_HASH]
+    assert [txn.txn_hash for txn in blocks[1].transactions] == [
+        'b1fea52486ce0c62bb442b530a3f0132b826c74e473d1f2c220bfa78111c5082',
+    ]
+
+
+def test_script_prefix_filter(blockchain_file):
+    blocks = read(blockchain_file, script_prefixes=[bytes.fromhex('4104ae1a')])
+
+    assert [b.hashcash for b in blocks] == [BLOCK_170_HASH]
+    assert [txn.txn_hash for txn in blocks[0].transactions] == [
+        'f4184fc596403b9d638783cf57adfe4c75c605f6356fbc91338530e9831e9e16',
+    ]
+
+
+def test_combined_filter(blockchain_file):
+    # the matching output must satisfy both transaction predicates
+    assert read(
+        blockchain_file,
+        script_prefixes=[bytes.fromhex('4104ae1a')],
+        min_value=20 * (10 ** 8),
+    ) == []
+
+
+def test_detect_mainnet(blockchain_file):
+    reader = BlockchainFileReader(blockchain_file)
+
+    assert reader.detect_network() is Network.mainnet
+    blocks = list(reader)
+    assert all(b.network is Network.mainnet for b in blocks)
+
+
+def test_detect_regtest(tmpdir, genesis_block):
+    path = tmpdir.join('blk00000.dat')
+    path.write_binary(with_magic_number(genesis_block, Network.regtest))
+
+    reader = BlockchainFileReader(str(path))
+    block, = reader
+
+    assert reader.network is Network.regtest
+    txn_output = block.transactions[0].outputs[0]
+    assert txn_output.network is Network.regtest
+    assert txn_output.address == 'mpXwg4jMtRhuSpVq4xS3HFHmCmWp9NyGKt'
+
+
+def test_genesis_hash_mismatch(tmpdir, genesis_block):
+    path = tmpdir.join('blk00000.dat')
+    path.write_binary(with_magic_number(genesis_block, Network.regtest))
+
+    assert len(list(BlockchainFileReader(str(path)))) == 1
+
+    # mainnet genesis block with the regtest magic number
+    with pytest.raises(ValueError):
+        list(BlockchainFileReader(str(path), strict=True))
+
+
+def test_magic_number_mismatch(tmpdir, genesis_block, block_170):
+    path = tmpdir.join('blk00000.dat')
+    path.write_binary(
+        genesis_block + with_magic_number(block_170, Network.testnet))
+
+    assert len(list(BlockchainFileReader(str(path)))) == 2
+
+    with pytest.raises(ValueError):
+        list(BlockchainFileReader(str(path), strict=True))
+
+    with pytest.raises(ValueError):
+        list(BlockchainFileReader(
+            str(path), network=Network.testnet, strict=True))
+
+
+def test_zero_padding(tmpdir, genesis_block):
+    path = tmpdir.join('blk00000.dat')
+    path.write_binary(genesis_block + bytes(1024))
+
+    assert len(list(BlockchainFileReader(str(path), strict=True))) == 1
+
+
+def test_empty_file(tmpdir):
+    path = tmpdir.join('blk00000.dat')
+    path.write_binary(b'')
+
+    reader = BlockchainFileReader(str(path))
+    assert list(reader) == []
+    assert reader.network is None
+
+
+@pytest.mark.parametrize('length', [3, 100])
+def test_truncated_file(tmpdir, genesis_block, length):
+    path = tmpdir.join('blk00000.dat')
+    path.write_binary(genesis_block[:length])
+
+    with pytest.raises(ValueError) as excinfo:
+        list(BlockchainFileReader(str(path)))
+    assert 'Truncated block at offset 0' in str(excinfo.value)
@@ -0,0 +1,203 @@
+import mmap
+
+import pytest
+
+from blockchain.block import Block
+from blockchain.script import (
+    OP_CHECKSIG,
+    OP_PUSHDATA1,
+    ScriptError,
+    ScriptType,
+    parse_script,
+    tokenize,
+)
+
+
+PUBKEY_HASH = bytes.fromhex('62e907b15cbf27d5425399ebf6f0fb50ebb88f18')
+COMPRESSED_PUBKEY = bytes.fromhex(
+    '0279be667ef9dcbbac55a06295ce870b07029bfcdb2dce28d959f2815b16f81798'
+)
+
+
+def test_tokenize_coinbase(genesis_block):
+    block = Block.from_binary_data(memoryview(genesis_block), offset=0)
+    script = block.transactions[0].inputs[0].signature_script
+
+    tokens = list(tokenize(script))
+
+    assert [opcode for opcode, _ in tokens] == [0x04, 0x01, 0x45]
+    assert [bytes(data) for _, data in tokens] == [
+        bytes.fromhex('ffff001d'),
+        b'\x04',
+        b'The Times 03/Jan/2009 Chancellor on '
+        b'brink of second bailout for banks',
+    ]
+    assert all(isinstance(data, memoryview) for _, data in tokens)
+
+
+def test_tokenize_pushdata():
+    script = bytes([OP_PUSHDATA1, 3]) + b'abc' + bytes([OP_CHECKSIG])
+
+    tokens = list(tokenize(script))
+
+    assert tokens[0][0] == OP_PUSHDATA1
+    assert bytes(tokens[0][1]) == b'abc'
+    assert tokens[1] == (OP_CHECKSIG, None)
+
+
+@pytest.mark.parametrize('script', [
+    bytes([0x05]) + b'abc',
+    bytes([OP_PUSHDATA1]),
+    bytes([0x4d, 0x01]),
+])
+def test_tokenize_truncated(script):
+    with pytest.raises(ScriptError):
+        list(tokenize(script))
+
+    parsed = parse_script(script)
+    assert parsed.type is ScriptType.nonstandard
+    assert not parsed.is_valid
+
+
+def test_p2pk(genesis_block):
+    block = Block.from_binary_data(memoryview(genesis_block), offset=0)
+    txn_output = block.transactions[0].outputs[0]
+
+    script = txn_output.script
+
+    assert script.type is ScriptType.p2pk
+    assert script.public_keys == [txn_output.script_pub_key[1:-1]]
+    assert script.required_signatures == 1
+
+
+def test_p2pk_hybrid_key():
+    raw = b'\x41\x06' + bytes(range(64)) + b'\xac'
+
+    script = parse_script(raw)
+
+    assert script.type is ScriptType.p2pk
+    assert script.public_keys == [raw[1:-1]]
+
+
+def test_p2pk_pushdata_key():
+    script = parse_script(b'\x4c\x21' + COMPRESSED_PUBKEY + b'\xac')
+
+    assert script.type is ScriptType.nonstandard
+    assert script.public_keys == []
+
+
+def test_p2pkh():
+    raw = bytes.fromhex('76a914') + PUBKEY_HASH + bytes.fromhex('88ac')
+
+    script = parse_script(raw)
+
+    assert script.type is ScriptType.p2pkh
+    assert script.hash == PUBKEY_HASH
+
+
+def test_p2sh():
+    raw = bytes.fromhex('a914') + PUBKEY_HASH + bytes.fromhex('87')
+
+    script = parse_script(raw)
+
+    assert script.type is ScriptType.p2sh
+    assert script.hash == PUBKEY_HASH
+
+
+def test_multisig():
+    raw = b''.join([
+        b'\x51',
+        b'\x21', COMPRESSED_PUBKEY,
+        b'\x21', COMPRESSED_PUBKEY,
+        b'\x52\xae',
+    ])
+
+    script = parse_script(raw)
+
+    assert script.type is ScriptType.multisig
+    assert script.required_signatures == 1
+    assert script.public_keys == [COMPRESSED_PUBKEY, COMPRESSED_PUBKEY]
+
+
+def test_multisig_pushdata_key():
+    raw = b''.join([
+        b'\x51',
+        b'\x4c\x21', COMPRESSED_PUBKEY,
+        b'\x51\xae',
+    ])
+
+    assert parse_script(raw).type is ScriptType.nonstandard
+
+
+@pytest.mark.parametrize('raw, script_type, witness_version', [
+    (b'\x00\x14' + PUBKEY_HASH, ScriptType.p2wpkh, 0),
+    (b'\x00\x20' + bytes(32), ScriptType.p2wsh, 0),
+    (b'\x51\x20' + bytes(32), ScriptType.p2tr, 1),
+    (b'\x52\x02\xab\xcd', ScriptType.witness_unknown, 2),
+])
+def test_witness_program(raw, script_type, witness_version):
+    script = parse_script(raw)
+
+    assert script.type is script_type
+    assert script.witness_version == witness_version
+    assert script.witness_program == raw[2:]
+    assert script.hash == raw[2:]
+
+
+def test_op_return():
+    raw = b'\x6a\x05hello' + bytes([OP_PUSHDATA1, 5]) + b'world'
+
+    script = parse_script(raw)
+
+    assert script.type is ScriptType.null_data
+    assert script.op_return_data == b'helloworld'
+
+
+def test_op_return_small_ints():
+    script = parse_script(b'\x6a\x51\x60\x4f\x50\x00\x01x')
+
+    assert script.type is ScriptType.null_data
+    assert script.op_return_data == b'\x01\x10\x81x'
+
+
+@pytest.mark.parametrize('raw', [
+    # truncated push
+    b'\x6a\x10abc',
+    # OP_CHECKSIG is not a push
+    b'\x6a\x01a\xac',
+])
+def test_op_return_not_push_only(raw):
+    script = parse_script(raw)
+
+    assert script.type is ScriptType.nonstandard
+    assert script.op_return_data is None
+
+
+def test_nonstandard():
+    script = parse_script(b'\x51')
+
+    assert script.type is ScriptType.nonstandard
+    assert script.hash is None
+    assert script.op_return_data is None
+
+
+def test_parse_script_cache():
+    raw = bytes.fromhex('76a914') + PUBKEY_HASH + bytes.fromhex('88ac')
+
+    assert parse_script(raw) is parse_script(bytes(bytearray(raw)))
+
+
+def test_parse_script_copies_buffer(tmpdir):
+    raw = bytes.fromhex('76a914') + PUBKEY_HASH + bytes.fromhex('88ac')
+    path = tmpdir.join('script.bin')
+    path.write_binary(bytes(100) + raw)
+
+    with open(str(path), 'rb') as f:
+        script_mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        script_mview = memoryview(script_mmap)
+        script = parse_script(script_mview[100:125])
+        script_mview.release()
+        script_mmap.close()
+
+    assert type(script.raw) is bytes
+    assert script is parse_script(raw)